@@ -1,236 +1,1066 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-In the following program, Iterative Deepening A* (IDA*) method 
-will be employed to solve an n-tile puzzle. The code can work with any size of 
+In the following program, Iterative Deepening A* (IDA*) method
+will be employed to solve an n-tile puzzle. The code can work with any size of
 the tile puzzle. However, for demonstration, start and goal states of a 8-tile
 puzzle will be used.
 
+Internally, every board is packed into a single integer, with each tile
+occupying 4 bits (one nibble per cell, supporting puzzles up to the
+15-puzzle). A state is then just a pair of small integers, so generating
+a move is a few bit operations instead of copying a nested list.
+
 First five initial instances used for demonstrations are:
     [0, 0, [[0, 7, 1], [4, 3, 2], [8, 6, 5]]],
-    [0, 2, [[5, 6, 0], [1, 3, 8], [4, 7, 2]]], 
-    [2, 0, [[3, 5, 6], [1, 2, 7], [0, 8, 4]]], 
-    [1, 1, [[7, 3, 5], [4, 0, 2], [8, 1, 6]]], 
+    [0, 2, [[5, 6, 0], [1, 3, 8], [4, 7, 2]]],
+    [2, 0, [[3, 5, 6], [1, 2, 7], [0, 8, 4]]],
+    [1, 1, [[7, 3, 5], [4, 0, 2], [8, 1, 6]]],
     [2, 0, [[6, 4, 8], [7, 1, 3], [0, 2, 5]]],
-and the goal state to reach is: 
-    [0, 2, [[3, 2, 0], [6, 1, 8], [4, 7, 5]]]  
+and the goal state to reach is:
+    [0, 2, [[3, 2, 0], [6, 1, 8], [4, 7, 5]]]
 
 Next five initial instances used for demonstrations are:
-    [0, 0, [[0, 1, 8], [3, 6, 7], [5, 4, 2]]], 
-    [2, 0, [[6, 4, 1], [7, 3, 2], [0, 5, 8]]], 
-    [0, 0, [[0, 7, 1], [5, 4, 8], [6, 2, 3]]], 
-    [0, 2, [[5, 4, 0], [2, 3, 1], [8, 7, 6]]], 
+    [0, 0, [[0, 1, 8], [3, 6, 7], [5, 4, 2]]],
+    [2, 0, [[6, 4, 1], [7, 3, 2], [0, 5, 8]]],
+    [0, 0, [[0, 7, 1], [5, 4, 8], [6, 2, 3]]],
+    [0, 2, [[5, 4, 0], [2, 3, 1], [8, 7, 6]]],
     [2, 1, [[8, 6, 7], [2, 5, 4], [3, 0, 1]]],
-with the goal state 
+with the goal state
     [2,2,[[1,2,3],[4,5,6],[7,8,0]]].
 
 As an output, the program will print:
-    1. Depth: the number of moves to reach the goal from each initial state 
-    (i.e. the number of states minus 1 in the shortest path from each instance 
+    1. Depth: the number of moves to reach the goal from each initial state
+    (i.e. the number of states minus 1 in the shortest path from each instance
     to the goal)
-    2. Total_yield: the total number states that the program yield during the 
+    2. Total_yield: the total number states that the program yield during the
     search for a solution for each initial instance
     3. Time: the computing time the search took for each initial instance
 """
 # importing the python libraries
-from copy import deepcopy
-from typing import List, Union
-from time import process_time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import factorial
+from multiprocessing import Process, Queue, Value
+from random import Random
+from time import process_time, sleep
+
+# numba is optional: when it is installed the pure-integer kernels below are
+# JIT-compiled to machine code, otherwise they run as ordinary Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
+
+def pack(grid: list) -> int:
+    """
+    Packing the grid function
+
+    Encoding a nested-list grid into a single integer, with the tile at row r
+    and column c stored in the nibble number n*r+c (4 bits per tile)
+
+    Params:
+    ----
+    - grid (list): the n x n nested list of tiles, with 0 as the blank tile
+
+    Returns:
+    ----
+    - packed (int): the packed integer encoding of the grid
+
+    """
+    n = len(grid)
+    packed = 0
+    for r in range(n):
+        for c in range(n):
+            packed |= grid[r][c] << (4 * (n*r + c))
+    return packed
+
+
+def build_neighbors(n: int) -> list:
+    """
+    Building the neighbor table function
+
+    Precomputing, for every cell of the puzzle, the list of adjacent cells
+    (down/up/right/left) the blank tile can move to, so the bounds checks are
+    done once instead of on every move
+
+    Params:
+    ----
+    - n (int): the number of rows/columns in the puzzle
+
+    Returns:
+    ----
+     - neighbors (list): for each flat position 0..n*n-1, the list of the flat
+     positions adjacent to it
+
+    """
+    neighbors = []
+    for i in range(n):
+        for j in range(n):
+            adjacent = []
+            if i+1 < n:
+                adjacent.append((i+1)*n + j)
+            if i-1 >= 0:
+                adjacent.append((i-1)*n + j)
+            if j+1 < n:
+                adjacent.append(i*n + j+1)
+            if j-1 >= 0:
+                adjacent.append(i*n + j-1)
+            neighbors.append(adjacent)
+    return neighbors
+
+
+# the neighbor and goal-position tables only depend on the puzzle size and
+# the goal board, so they are built once and cached at module level instead
+# of being rebuilt for every solved instance
+_NEIGHBORS = {}
+_GOAL_CELLS = {}
+_PDB = {}
+_DIST = {}
+_PERIMETER = {}
+_ZOBRIST = {}
+
+# limits of the backward search perimeter around the goal: complete breadth
+# first search layers are added until either bound is hit
+PERIMETER_DEPTH = 12
+PERIMETER_STATES = 200000
+
+# tile partition of the additive pattern databases for the 8-puzzle; each
+# group is precomputed by an exhaustive search over its abstract state space
+# and the heuristic is the sum of the two group distances
+PDB_GROUPS = ((1, 2, 3, 4), (5, 6, 7, 8))
+
+def get_neighbors(n: int) -> list:
+    """
+    Getting the cached neighbor table function
+
+    Returning the neighbor table for an n x n puzzle, building it on first
+    use and reusing it afterwards
+
+    Params:
+    ----
+    - n (int): the number of rows/columns in the puzzle
+
+    Returns:
+    ----
+     - neighbors (list): the neighbor table from build_neighbors
+
+    """
+    table = _NEIGHBORS.get(n)
+    if table is None:
+        table = _NEIGHBORS[n] = build_neighbors(n)
+    return table
+
+
+def get_goal_cells(grid: list) -> int:
+    """
+    Getting the cached goal cell table function
+
+    Returning the goal cell of each tile packed into a single integer (the
+    nibble number t holds the flat cell where tile t belongs), building the
+    table on first use for a given goal board and reusing it afterwards.
+    Keeping the table as a plain integer lets the heuristic kernels work on
+    nothing but machine words, which is what numba compiles best
+
+    Params:
+    ----
+    - grid (list): the n x n nested list of the goal board
+
+    Returns:
+    ----
+     - goal_cells (int): the packed flat goal cell of each tile
+
+    """
+    key = pack(grid)
+    table = _GOAL_CELLS.get(key)
+    if table is None:
+        n = len(grid)
+        table = 0
+        for r in range(n):
+            for c in range(n):
+                table |= (n*r + c) << (4 * grid[r][c])
+        _GOAL_CELLS[key] = table
+    return table
+
 
-def move_blank(i: int , j: int, n: int) -> tuple:
+def build_pdb(grid: list, tiles: tuple) -> bytes:
     """
-    Moving the blank tile function
-    
-    Yielding all the possible movements of the blank tile (down/up/right/left) 
-    from 1 state with 1 move
-    
+    Building a pattern database function
+
+    Running a best-first search backwards from the goal over the abstract
+    state space where only the given pattern tiles and the blank are
+    distinguished; every other tile is a "don't care". A move costs 1 only
+    when it slides a pattern tile (blank moves through don't-care tiles are
+    free), which keeps the databases of disjoint groups additive. The result
+    maps the positions of the pattern tiles to the minimum number of
+    pattern-tile moves needed to bring them home
+
+    Params:
+    ----
+    - grid (list): the n x n nested list of the goal board
+    - tiles (tuple): the pattern tiles of this group
+
+    Returns:
+    ----
+     - table (bytes): flat array indexed by the pattern-position key (the
+     tiles' flat cells folded in base n*n, in group order) holding the
+     minimum pattern-tile moves to the goal; a contiguous byte per entry
+     keeps the whole table cache-resident during the search
+
+    """
+    n = len(grid)
+    n2 = n * n
+    neighbors = get_neighbors(n)
+    cell_of = {grid[r][c]: n*r + c for r in range(n) for c in range(n)}
+
+    start = (cell_of[0], tuple(cell_of[t] for t in tiles))
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        blank, positions = state
+        d = dist[state]
+        for pos in neighbors[blank]:
+            if pos in positions:
+                i = positions.index(pos)
+                child = (pos, positions[:i] + (blank,) + positions[i+1:])
+                child_d = d + 1
+            else:
+                child = (pos, positions)
+                child_d = d
+            if child_d < dist.get(child, float('inf')):
+                dist[child] = child_d
+                # 0-1 breadth first search: free blank moves go to the front
+                if child_d == d:
+                    queue.appendleft(child)
+                else:
+                    queue.append(child)
+
+    table = bytearray(b'\xff' * n2**len(tiles))
+    for (blank, positions), d in dist.items():
+        key = 0
+        for pos in positions:
+            key = key*n2 + pos
+        if d < table[key]:
+            table[key] = d
+    return bytes(table)
+
+
+def get_pdb(grid: list) -> tuple:
+    """
+    Getting the cached pattern databases function
+
+    Returning the additive pattern databases for a goal board together with
+    the lookup helpers the search needs to update a pattern key when one
+    tile moves, building everything on first use for a given goal and
+    reusing it afterwards
+
+    Params:
+    ----
+    - grid (list): the n x n nested list of the goal board
+
+    Returns:
+    ----
+     - tables (tuple): one distance table per group in PDB_GROUPS
+     - group_of (list): for each tile, the index of its group
+     - weight (list): for each tile, the base-n*n place value of its
+     position inside its group's key
+
+    """
+    key = pack(grid)
+    entry = _PDB.get(key)
+    if entry is None:
+        n = len(grid)
+        n2 = n * n
+        tables = tuple(build_pdb(grid, tiles) for tiles in PDB_GROUPS)
+        group_of = [-1] * n2
+        weight = [0] * n2
+        for group, tiles in enumerate(PDB_GROUPS):
+            for i, tile in enumerate(tiles):
+                group_of[tile] = group
+                weight[tile] = n2 ** (len(tiles) - 1 - i)
+        entry = _PDB[key] = (tables, group_of, weight)
+    return entry
+
+
+def pattern_keys(packed: int, n: int) -> tuple:
+    """
+    Computing the pattern keys function
+
+    Extracting, for each group in PDB_GROUPS, the key of a state into that
+    group's pattern database (the flat cells of the group's tiles folded in
+    base n*n, in group order)
+
     Params:
     ----
-    - i (int): the vertical position of the blank tile, i is in range (0,n-1)
-    - j (int): the vertical position of the blank tile, j is in range (0,n-1)
+    - packed (int): the packed integer encoding of the state
     - n (int): the number of rows/columns in the puzzle
-    
+
+    Returns:
+    ----
+     - keys (tuple): one database key per group
+
+    """
+    n2 = n * n
+    cell = [0] * n2
+    for pos in range(n2):
+        cell[(packed >> (4*pos)) & 0xF] = pos
+    keys = []
+    for tiles in PDB_GROUPS:
+        key = 0
+        for tile in tiles:
+            key = key*n2 + cell[tile]
+        keys.append(key)
+    return tuple(keys)
+
+
+@njit(cache=True)
+def lehmer_index(packed: int, n2: int) -> int:
+    """
+    Lehmer index function
+
+    Ranking the board permutation into the range 0..n2!-1 (a perfect hash):
+    reading the cells in order, each tile contributes its rank among the
+    tiles not seen yet as one digit of a factorial-base number. The body is
+    pure integer arithmetic so numba (when installed) compiles it to
+    machine code
+
+    Params:
+    ----
+    - packed (int): the packed integer encoding of the state
+    - n2 (int): the number of cells n*n in the puzzle
+
     Returns:
     ----
-     - (i1,j1) (tuple): all the possible positions of the blank tile as tuples of (i,j)
-    
+     - index (int): the rank of the permutation, in range(factorial(n2))
+
     """
-    if i+1 < n:
-        yield (i+1, j)
-    if i-1 >= 0:
-        yield (i-1, j)
-    if j+1 < n:
-        yield (i, j+1) 
-    if j-1 >= 0:
-        yield (i, j-1)
+    index = 0
+    seen = 0
+    for pos in range(n2):
+        tile = (packed >> (4*pos)) & 0xF
+        rank = tile
+        below = seen & ((1 << tile) - 1)
+        while below:
+            below &= below - 1
+            rank -= 1
+        index = index * (n2 - pos) + rank
+        seen |= 1 << tile
+    return index
 
 
-def move(state: List) -> List:
+def build_dist_table(grid: list) -> bytes:
     """
-    Changing the state function
-    
-    Yielding all the possible states can be generated from 1 state after 1 move
-    
+    Building the exact distance table function
+
+    Running one breadth first search backwards from the goal over the whole
+    state space and recording the exact solution depth of every reachable
+    state, indexed by its Lehmer index. For the 8-puzzle this is a
+    362880-byte array built once; solving an instance afterwards is a
+    single lookup. Unreachable permutations (the unsolvable half of the
+    space) keep the sentinel value 0xFF
+
     Params:
     ----
-    - state (list): the state before such move
-    
+    - grid (list): the n x n nested list of the goal board
+
     Returns:
     ----
-    - next_state (list): all the next possilbe states after such move
-    
+     - table (bytes): Lehmer index -> exact distance to the goal, with
+     0xFF marking unreachable states
+
     """
-    global number_of_yield
-    [i, j, grid] = deepcopy(state) 
     n = len(grid)
-    for pos in move_blank(i, j, n):
-        i1, j1 = pos
-        grid[i][j], grid[i1][j1] = grid[i1][j1], grid[i][j]
-        yield [i1, j1, grid] 
-        number_of_yield += 1
-        grid[i][j], grid[i1][j1] = grid[i1][j1], grid[i][j]
+    n2 = n * n
+    neighbors = get_neighbors(n)
+    goal_packed = pack(grid)
+    blank = next(n*r + c for r in range(n) for c in range(n)
+                 if grid[r][c] == 0)
+
+    table = bytearray(b'\xff' * factorial(n2))
+    table[lehmer_index(goal_packed, n2)] = 0
+    queue = deque([(blank, goal_packed, 0)])
+    while queue:
+        blank, packed, d = queue.popleft()
+        shift1 = 4 * blank
+        for pos in neighbors[blank]:
+            shift2 = 4 * pos
+            tile = (packed >> shift2) & 0xF
+            child = packed ^ (tile << shift2) ^ (tile << shift1)
+            index = lehmer_index(child, n2)
+            if table[index] == 0xFF:
+                table[index] = d + 1
+                queue.append((pos, child, d + 1))
+    return bytes(table)
 
 
-def manhattan_distance(state: List, goal: List) -> int:
+def get_dist_table(grid: list) -> bytes:
+    """
+    Getting the cached exact distance table function
+
+    Returning the exact distance table for a goal board, building it on
+    first use and reusing it afterwards (the demo solves five instances
+    per goal against one table)
+
+    Params:
+    ----
+    - grid (list): the n x n nested list of the goal board
+
+    Returns:
+    ----
+     - table (bytes): the distance table from build_dist_table
+
+    """
+    key = pack(grid)
+    table = _DIST.get(key)
+    if table is None:
+        table = _DIST[key] = build_dist_table(grid)
+    return table
+
+
+def build_perimeter(goal: list) -> dict:
+    """
+    Building the goal perimeter function
+
+    Running a breadth first search backwards from the goal and recording the
+    exact distance of every state it reaches, layer by layer, until either
+    PERIMETER_DEPTH or PERIMETER_STATES is exceeded. The forward search can
+    then stop as soon as it touches the perimeter: the remaining distance is
+    already known, so the two searches meet in the middle and the forward
+    part only has to cover the depth the perimeter does not
+
+    Params:
+    ----
+    - goal (list): the n x n nested list of the goal board
+
+    Returns:
+    ----
+     - perimeter (dict): packed state -> exact distance to the goal, for
+     every state within the explored ball around the goal
+
+    """
+    n = len(goal)
+    neighbors = get_neighbors(n)
+    goal_packed = pack(goal)
+    blank = next(n*r + c for r in range(n) for c in range(n)
+                 if goal[r][c] == 0)
+
+    perimeter = {goal_packed: 0}
+    layer = [(blank, goal_packed)]
+    for d in range(1, PERIMETER_DEPTH + 1):
+        next_layer = []
+        for blank, packed in layer:
+            shift1 = 4 * blank
+            for pos in neighbors[blank]:
+                shift2 = 4 * pos
+                tile = (packed >> shift2) & 0xF
+                child = packed ^ (tile << shift2) ^ (tile << shift1)
+                if child not in perimeter:
+                    perimeter[child] = d
+                    next_layer.append((pos, child))
+        layer = next_layer
+        if not layer or len(perimeter) > PERIMETER_STATES:
+            break
+    return perimeter
+
+
+def get_perimeter(grid: list) -> dict:
+    """
+    Getting the cached goal perimeter function
+
+    Returning the backward-search perimeter for a goal board, building it on
+    first use and reusing it afterwards (the demo solves five instances
+    per goal against one perimeter)
+
+    Params:
+    ----
+    - grid (list): the n x n nested list of the goal board
+
+    Returns:
+    ----
+     - perimeter (dict): the perimeter from build_perimeter
+
+    """
+    key = pack(grid)
+    perimeter = _PERIMETER.get(key)
+    if perimeter is None:
+        perimeter = _PERIMETER[key] = build_perimeter(grid)
+    return perimeter
+
+
+def get_zobrist(n2: int) -> list:
+    """
+    Getting the cached Zobrist table function
+
+    Returning one random 64-bit number per (cell, tile) pair, built on first
+    use for a puzzle size and reused afterwards. XORing the numbers of the
+    occupied (cell, tile) pairs of a board gives its Zobrist hash, which the
+    parallel search uses to assign every state to a fixed owner process. The
+    generator is seeded with a constant so every process derives the same
+    table and therefore agrees on who owns what; the entries of the blank
+    tile are left at zero, since its position is implied by the others
+
+    Params:
+    ----
+    - n2 (int): the number of cells n*n in the puzzle
+
+    Returns:
+    ----
+     - table (list): the random number of each pair, at index 16*cell + tile
+
+    """
+    table = _ZOBRIST.get(n2)
+    if table is None:
+        rng = Random(0)
+        table = [0] * (16 * n2)
+        for pos in range(n2):
+            for tile in range(1, n2):
+                table[16*pos + tile] = rng.getrandbits(64)
+        _ZOBRIST[n2] = table
+    return table
+
+
+def zobrist_hash(packed: int, n2: int) -> int:
+    """
+    Zobrist hash function
+
+    Hashing a board by XORing the Zobrist numbers of its occupied (cell,
+    tile) pairs. The search itself never calls this per node: one move only
+    changes one pair, so the hash of a child is the parent's hash XORed with
+    the moved tile's old and new numbers
+
+    Params:
+    ----
+    - packed (int): the packed integer encoding of the state
+    - n2 (int): the number of cells n*n in the puzzle
+
+    Returns:
+    ----
+     - zh (int): the 64-bit Zobrist hash of the board
+
+    """
+    table = get_zobrist(n2)
+    zh = 0
+    for pos in range(n2):
+        zh ^= table[16*pos + ((packed >> (4*pos)) & 0xF)]
+    return zh
+
+
+@njit(cache=True)
+def manhattan_distance(packed: int, goal_cells: int, n: int) -> int:
     """
     Manhattan distance function.
 
-    Calculating the sum of the distances (sum of the vertical and horizontal 
-    distance) of each tile in the n-tile puzzle to it's goal position.
-    
+    Calculating the sum of the distances (sum of the vertical and horizontal
+    distance) of each tile in the n-tile puzzle to it's goal position, by
+    extracting one nibble per cell from the packed integer. The body is pure
+    integer arithmetic so numba (when installed) compiles it to machine code
+
     Params:
     ----
-     - instance (List): the initial instance/state
-     - goal (List): the goal state
-     
+     - packed (int): the packed integer encoding of the state
+     - goal_cells (int): the packed flat goal cell of each tile
+     - n (int): the number of rows/columns in the puzzle
+
     Return:
     ----
     - distance (int): the Manhattan distance
     """
-    
-    d_state = {state[i][j]: (i, j) for i in range(len(state)) for j in range(len(state[i]))}
-    d_goal = {goal[i][j]: (i, j) for i in range(len(state)) for j in range(len(state[i]))}
-    manhattan_func = lambda x, y: abs(x[0]-y[0]) + abs(x[1]-y[1]) 
+
     distance = 0
-    for number in d_state.keys():
-        if number != 0:
-            distance += manhattan_func(d_state[number], d_goal[number])
-    
+    for pos in range(n*n):
+        tile = (packed >> (4*pos)) & 0xF
+        if tile != 0:
+            goal_cell = (goal_cells >> (4*tile)) & 0xF
+            distance += (abs(pos//n - goal_cell//n)
+                         + abs(pos%n - goal_cell%n))
+
     return distance
 
 
-def ida_star(state: List, goal: List) -> Union[None, int]:
+def ida_star(state: list, goal: list, exact: bool=True, workers: int=1) -> tuple:
     """
     Iterative deepening A* (IDA*) function.
 
     Implementing IDA* algorithm to find the shortest path to the goal state from
-    an instance (initial state)
-        
+    an instance (initial state). For the 8-puzzle the whole state space fits
+    in one precomputed distance table, so by default the depth is answered
+    from a single table lookup and no search runs at all; pass exact=False
+    (or a larger puzzle) to run the actual IDA* search
+
     Params:
     ----
      - instance (List): the initial instance/state
      - goal (List): the goal state
-     
+     - exact (bool): whether a 3x3 instance may be answered from the
+     precomputed exact distance table instead of searching
+     - workers (int): the number of processes to hash-partition the search
+     across; the default runs the search sequentially in this process,
+     which is the right choice unless the instance is deep enough (roughly
+     beyond depth 25 on the 15-puzzle) to pay for the process startup
+
     Return:
     ----
-    - None if the solution is not found
-    - The depth to reach the goal state (which is the heuristic value at the "is goal" state)
+    - Whether a solution was found, the depth to reach the goal state (which
+    is the heuristic value at the "is goal" state), and the total number of
+    states generated during the search
     """
-    
-    def search(state: List, goal: List, g: int, threshold: int, path: List) -> int:
+
+    n = len(goal[-1])
+    neighbors = get_neighbors(n)
+    goal_cells = get_goal_cells(goal[-1])
+    state = (state[0]*n + state[1], pack(state[-1]))
+
+    if exact and n == 3:
+        depth = get_dist_table(goal[-1])[lehmer_index(state[1], n*n)]
+        if depth == 0xFF:
+            # the unsolvable half of the permutation space
+            return False, float('inf'), 0
+        return True, depth, 0
+
+    # the pattern databases currently cover the 8-puzzle tile set; larger
+    # puzzles fall back to the Manhattan distance heuristic
+    if n == 3:
+        pdb, group_of, weight = get_pdb(goal[-1])
+    else:
+        pdb = None
+
+    # every state within the backward-search ball around the goal has a
+    # known exact distance (which also subsumes the goal test itself), so
+    # an instance already inside the ball is answered without searching
+    perimeter = get_perimeter(goal[-1])
+    back = perimeter.get(state[1])
+    if back is not None:
+        return True, back, 0
+
+    if workers > 1:
+        return hda_star(state, goal, workers)
+
+    def search(root: tuple, h_root: int, root_keys: tuple, threshold: int) -> tuple:
         """
-        Recusive search function.
+        Cost-bounded search function.
+
+        Implementing one threshold iteration of IDA* as a loop over an
+        explicit stack of frames instead of recursion, so no Python call
+        frame is created per expanded node. Each frame holds one state of
+        the current path as [blank, packed, h, key0, key1, prev_blank,
+        next_neighbor], where next_neighbor is the index of the next child
+        to try; the depth of a state is simply its index on the stack. The
+        heuristic h (pattern database sum, or Manhattan distance when no
+        database is available) is carried in the frame and updated by the
+        delta of the single tile each move displaces, instead of being
+        recomputed over the whole board at every node. The frame rows and
+        the transposition table live in the enclosing scope and are reused
+        by every iteration, so descending one level rewrites a preallocated
+        row instead of allocating anything
 
-        Implementing A* algorithm to find the shortest path to the goal state from
-        an instance (initial state), with the boundary of heuristic value = the
-        threshold    
-            
         Params:
         ----
-         - state (List): this state
-         - goal (List): the goal state
-         - g (int): the depth until current state
+         - root (Tuple): the initial state as (blank position, packed grid)
+         - h_root (int): the heuristic value of the initial state
+         - root_keys (Tuple): the pattern database keys of the initial
+         state, ignored when the Manhattan fallback is used
          - threshold (int): the threshold (the maximum boundary for the value of
          the heuristic function)
-         - path (List): the path from initial state to this state
-         
+
         Return:
         ----
-        - minimum (int): the minimum value of the heuristic function in the search
-          or f (int): the new threshold if threshold exceeded
+        - (True, total) when the forward search meets the backward-search
+          perimeter within the threshold, where total is the exact solution
+          cost, or (False, minimum) with the new threshold otherwise
         """
-        
-        f = g + manhattan_distance(state[-1], goal[-1])
-       
-        if f > threshold: 
-            return f
-        
-        if state == goal: 
-            return True
-
-        minimum = float('inf') 
-        for next_move in move(state): 
-            if next_move not in path: 
-                tmp = search(next_move, goal, g + 1, threshold, path + [next_move])
-                if tmp == True: 
-                    return True
-                if tmp < minimum: 
-                    minimum = tmp
-        return minimum 
-  
-    path = [state]
-
-    threshold = manhattan_distance(state[-1], goal[-1])
+
+        # generated children are counted in a local and flushed into the
+        # shared cell on exit, keeping a plain fast-local increment in the
+        # hot loop instead of a global lookup and store per child
+        yields = 0
+        minimum = float('inf')
+        # everything the loop touches per child is bound to a local first:
+        # a LOAD_FAST per access instead of a closure-cell or method lookup
+        neighbor_table = neighbors
+        perimeter_get = perimeter.get
+        use_pdb = pdb is not None
+        if use_pdb:
+            pdb0, pdb1 = pdb
+            group_table = group_of
+            weight_table = weight
+        transposition_get = transposition.get
+        # a push can only happen at depth <= threshold, so threshold + 1
+        # rows cover the deepest possible path of this iteration
+        while len(frames) <= threshold + 1:
+            frames.append([0, 0, 0, 0, 0, 0, 0])
+        frames[0][:] = root[0], root[1], h_root, root_keys[0], root_keys[1], -1, 0
+        top = 0
+        # transposition table: packed state -> shallowest depth expanded at
+        # during this iteration; a state reached again no deeper than that
+        # has already been explored with at least as much budget, so it can
+        # be skipped. This also covers the cycle check on the current path,
+        # whose states are all recorded at shallower depths
+        transposition.clear()
+        transposition[root[1]] = 0
+
+        while top >= 0:
+            frame = frames[top]
+            blank, packed, h, key0, key1, prev_blank, index = frame
+            adjacent = neighbor_table[blank]
+            if index >= len(adjacent):
+                top -= 1
+                continue
+            frame[6] = index + 1
+            pos = adjacent[index]
+            if pos == prev_blank:
+                continue
+            shift2 = 4 * pos
+            tile = (packed >> shift2) & 0xF
+            child = packed ^ (tile << shift2) ^ (tile << (4*blank))
+            yields += 1
+            depth = top + 1
+            seen = transposition_get(child)
+            if seen is not None and seen <= depth:
+                continue
+            # the moved tile went from cell pos to the current blank cell;
+            # only its term of h (one pattern key, or one Manhattan term)
+            # changes
+            child_key0, child_key1 = key0, key1
+            if use_pdb:
+                shift_key = (blank - pos) * weight_table[tile]
+                if group_table[tile] == 0:
+                    child_key0 = key0 + shift_key
+                    child_h = h - pdb0[key0] + pdb0[child_key0]
+                else:
+                    child_key1 = key1 + shift_key
+                    child_h = h - pdb1[key1] + pdb1[child_key1]
+            else:
+                goal_r, goal_c = divmod((goal_cells >> (4*tile)) & 0xF, n)
+                r, c = divmod(blank, n)
+                r1, c1 = divmod(pos, n)
+                child_h = h + (abs(r - goal_r) + abs(c - goal_c)
+                               - abs(r1 - goal_r) - abs(c1 - goal_c))
+            f = depth + child_h
+            if f > threshold:
+                if f < minimum:
+                    minimum = f
+                continue
+            # meeting the perimeter ends the search: the remaining distance
+            # is exact, so depth + back is a real solution cost, and one
+            # accepted within the threshold is optimal (no threshold ever
+            # skips past the optimal cost). A meeting that overshoots the
+            # threshold still bounds the next one
+            back = perimeter_get(child)
+            if back is not None:
+                total = depth + back
+                if total <= threshold:
+                    counter[0] += yields
+                    return True, total
+                if total < minimum:
+                    minimum = total
+                continue
+            transposition[child] = depth
+            top += 1
+            frames[top][:] = pos, child, child_h, child_key0, child_key1, blank, 0
+
+        counter[0] += yields
+        return False, minimum
+
+    # buffers shared by all threshold iterations: the frame rows are grown
+    # once per new threshold and rewritten in place, and the transposition
+    # dict is cleared rather than reallocated
+    frames = []
+    transposition = {}
+
+    if pdb is not None:
+        keys = pattern_keys(state[1], n)
+        h = pdb[0][keys[0]] + pdb[1][keys[1]]
+    else:
+        keys = (0, 0)
+        h = manhattan_distance(state[1], goal_cells, n)
+    threshold = h
+    counter = [0]
 
     while True:
-        tmp = search(path[-1], goal, 0, threshold, path)
-        if tmp == True: 
-            return True, threshold
-        elif tmp == float('inf'): 
-            return False, float('inf')
+        found, value = search(state, h, keys, threshold)
+        if found:
+            return True, value, counter[0]
+        elif value == float('inf'):
+            return False, float('inf'), counter[0]
         else:
-            threshold = tmp
+            threshold = value
+
+
+
+def hda_worker(rank: int, workers: int, goal: list, inbox: Queue,
+               queues: list, results: Queue, pending: Value) -> None:
+    """
+    Hash-distributed search worker function
 
+    Running one worker process of the parallel search. Every state is owned
+    by the process whose rank equals its Zobrist hash modulo the number of
+    workers, so each worker only ever expands its own states and its
+    transposition table needs no sharing or locking: a duplicate always
+    reaches the same owner. The worker pops work from its inbox, runs a
+    cost-bounded depth first search over it, keeps self-owned children on a
+    local stack and sends the rest to their owners' queues. The shared
+    pending counter is raised before every cross-process send and lowered
+    once the received work is fully expanded, so the master can tell when an
+    iteration has drained. The worker then reports its statistics when asked
+    and waits for the next threshold (or the stop message)
 
+    Params:
+    ----
+    - rank (int): the index of this worker, in range(workers)
+    - workers (int): the total number of worker processes
+    - goal (list): the goal state, from which the worker rebuilds its own
+    cached tables (neighbors, pattern databases, perimeter, Zobrist)
+    - inbox (Queue): the queue this worker receives its messages on
+    - queues (list): the inboxes of all workers, indexed by rank
+    - results (Queue): the queue the per-iteration reports are sent on
+    - pending (Value): the shared count of work not yet fully expanded
+
+    Returns:
+    ----
+    - None: the function returns when the stop message arrives
 
-def run(instance, goal) -> None:
     """
-    Run the program
-    
-    Running the program and print the output (Depth, Total_yield, Time):
-    
+    n = len(goal[-1])
+    neighbors = get_neighbors(n)
+    goal_cells = get_goal_cells(goal[-1])
+    perimeter = get_perimeter(goal[-1])
+    zobrist = get_zobrist(n*n)
+    if n == 3:
+        pdb, group_of, weight = get_pdb(goal[-1])
+        pdb0, pdb1 = pdb
+    else:
+        pdb = None
+    use_pdb = pdb is not None
+
+    transposition = {}
+    threshold = -1
+    best = minimum = float('inf')
+    yields = 0
+    stack = []
+    while True:
+        message = inbox.get()
+        kind = message[0]
+        if kind == 'stop':
+            return
+        if kind == 'report':
+            if message[1] == threshold:
+                results.put((best, minimum, yields))
+            else:
+                # no work of the reported iteration ever reached this worker
+                results.put((float('inf'), float('inf'), 0))
+            continue
+        _, t, item = message
+        if t > threshold:
+            # first work of a new threshold iteration: start from a fresh
+            # transposition table and fresh statistics
+            threshold = t
+            transposition.clear()
+            best = minimum = float('inf')
+            yields = 0
+        # once a solution within the threshold is known it is optimal, so
+        # the remaining work of the iteration is only drained, not expanded
+        if best == float('inf'):
+            stack.append(item)
+        while stack:
+            blank, packed, depth, h, key0, key1, prev_blank, zh = stack.pop()
+            # duplicate detection is local to the owner: a state reached
+            # again no deeper than it was already expanded at is skipped
+            seen = transposition.get(packed)
+            if seen is not None and seen <= depth:
+                continue
+            transposition[packed] = depth
+            depth1 = depth + 1
+            for pos in neighbors[blank]:
+                if pos == prev_blank:
+                    continue
+                shift2 = 4 * pos
+                tile = (packed >> shift2) & 0xF
+                child = packed ^ (tile << shift2) ^ (tile << (4*blank))
+                yields += 1
+                child_key0, child_key1 = key0, key1
+                if use_pdb:
+                    shift_key = (blank - pos) * weight[tile]
+                    if group_of[tile] == 0:
+                        child_key0 = key0 + shift_key
+                        child_h = h - pdb0[key0] + pdb0[child_key0]
+                    else:
+                        child_key1 = key1 + shift_key
+                        child_h = h - pdb1[key1] + pdb1[child_key1]
+                else:
+                    goal_r, goal_c = divmod((goal_cells >> (4*tile)) & 0xF, n)
+                    r, c = divmod(blank, n)
+                    r1, c1 = divmod(pos, n)
+                    child_h = h + (abs(r - goal_r) + abs(c - goal_c)
+                                   - abs(r1 - goal_r) - abs(c1 - goal_c))
+                f = depth1 + child_h
+                if f > threshold:
+                    if f < minimum:
+                        minimum = f
+                    continue
+                back = perimeter.get(child)
+                if back is not None:
+                    total = depth1 + back
+                    if total <= threshold:
+                        best = total
+                        stack.clear()
+                        break
+                    if total < minimum:
+                        minimum = total
+                    continue
+                child_zh = (zh ^ zobrist[16*pos + tile]
+                            ^ zobrist[16*blank + tile])
+                child_item = (pos, child, depth1, child_h,
+                              child_key0, child_key1, blank, child_zh)
+                owner = child_zh % workers
+                if owner == rank:
+                    stack.append(child_item)
+                else:
+                    with pending.get_lock():
+                        pending.value += 1
+                    queues[owner].put(('work', threshold, child_item))
+        # the received work and everything it spawned locally is finished
+        with pending.get_lock():
+            pending.value -= 1
+
+
+def hda_star(root: tuple, goal: list, workers: int) -> tuple:
+    """
+    Hash-distributed IDA* (HDA*) function
+
+    Parallelizing the search for a single instance by partitioning the state
+    space across worker processes by Zobrist hash, so every worker detects
+    duplicates of its own states locally. The threshold iterations stay
+    sequential: for each threshold the master seeds the owner of the root,
+    waits for the pending counter to show that all work has drained, then
+    collects each worker's best solution cost and threshold overshoot and
+    either answers or starts the next iteration. Called by ida_star when
+    workers > 1 is requested
+
+    Params:
+    ----
+    - root (tuple): the initial state as (blank position, packed grid)
+    - goal (list): the goal state
+    - workers (int): the number of worker processes to partition across
+
+    Returns:
+    ----
+    - The same triple as ida_star: whether a solution was found, the depth
+    to reach the goal state, and the total number of states generated
+    across all workers
+
+    """
+    n = len(goal[-1])
+    if n == 3:
+        tables, _, _ = get_pdb(goal[-1])
+        keys = pattern_keys(root[1], n)
+        h = tables[0][keys[0]] + tables[1][keys[1]]
+    else:
+        keys = (0, 0)
+        h = manhattan_distance(root[1], get_goal_cells(goal[-1]), n)
+    zh = zobrist_hash(root[1], n*n)
+    item = (root[0], root[1], 0, h, keys[0], keys[1], -1, zh)
+
+    pending = Value('i', 0)
+    queues = [Queue() for _ in range(workers)]
+    results = Queue()
+    processes = [Process(target=hda_worker,
+                         args=(rank, workers, goal, queues[rank], queues,
+                               results, pending))
+                 for rank in range(workers)]
+    for process in processes:
+        process.start()
+
+    threshold = h
+    number_of_yield = 0
+    while True:
+        # the counter is raised before every cross-process send (the seed
+        # included) and lowered only after the received work is fully
+        # expanded, so zero means every queue is empty and every worker
+        # is idle: the iteration has drained
+        with pending.get_lock():
+            pending.value += 1
+        queues[zh % workers].put(('work', threshold, item))
+        while True:
+            with pending.get_lock():
+                if pending.value == 0:
+                    break
+            sleep(0.001)
+        for queue in queues:
+            queue.put(('report', threshold))
+        best = minimum = float('inf')
+        for _ in range(workers):
+            worker_best, worker_minimum, worker_yields = results.get()
+            best = min(best, worker_best)
+            minimum = min(minimum, worker_minimum)
+            number_of_yield += worker_yields
+        if best != float('inf'):
+            answer = True, best, number_of_yield
+            break
+        if minimum == float('inf'):
+            answer = False, float('inf'), number_of_yield
+            break
+        threshold = minimum
+    for queue in queues:
+        queue.put(('stop',))
+    for process in processes:
+        process.join()
+    return answer
+
+
+def run(args) -> tuple:
+    """
+    Run one instance
+
+    Solving one instance and measuring the search; the instances are
+    independent, so the main block maps this function over a process pool
+    and prints the collected results in order. The argument is a single
+    (instance, goal) tuple so the function can be passed to executor.map
+
     params:
-    - instance (List): the initial instance/state
-    - goal (List): the goal state
+    - args (tuple): the initial instance/state and the goal state
+
+    Returns:
+    ----
+    - depth (int): the number of moves to reach the goal
+    - number_of_yield (int): the total number of states generated
+    - elapsed (float): the CPU time the search took in this process
     """
+    instance, goal = args
     t = process_time()
-    _, depth = ida_star(instance, goal)
-    elapsed = process_time() - t 
-    print(f"Depth = {(depth):3} --- Total_yield: {number_of_yield:6} --- Time = {elapsed:8.2f}")
+    _, depth, number_of_yield = ida_star(instance, goal)
+    elapsed = process_time() - t
+    return depth, number_of_yield, elapsed
 
 # Declaring the goal and the initial instances, and running the program:
 
 if __name__ == '__main__':
-    print("First five instances:", end='\n')
-    goal = [0, 2, [[3, 2, 0], [6, 1, 8], [4, 7, 5]]]
-    instances = [[0, 0, [[0, 7, 1], [4, 3, 2], [8, 6, 5]]], 
-                [0, 2, [[5, 6, 0], [1, 3, 8], [4, 7, 2]]],
-                [2, 0, [[3, 5, 6], [1, 2, 7], [0, 8, 4]]],
-                [1, 1, [[7, 3, 5], [4, 0, 2], [8, 1, 6]]],
-                [2, 0, [[6, 4, 8], [7, 1, 3], [0, 2, 5]]],]
-
-    for instance in instances:
-        number_of_yield = 0
-        run(instance, goal)
-
-    print("Next five instances:", end='\n')
-    goal = [2, 2, [[1, 2, 3], [4, 5, 6], [7, 8, 0]]]
-    instances = [[0, 0, [[0, 1, 8], [3, 6, 7], [5, 4, 2]]],
-                 [2, 0, [[6, 4, 1], [7, 3, 2], [0, 5, 8]]],
-                 [0, 0, [[0, 7, 1], [5, 4, 8], [6, 2, 3]]],
-                 [0, 2, [[5, 4, 0], [2, 3, 1], [8, 7, 6]]],
-                 [2, 1, [[8, 6, 7], [2, 5, 4], [3, 0, 1]]],]
-
-    for instance in instances:
-        number_of_yield = 0
-        run(instance, goal)
\ No newline at end of file
+    with ProcessPoolExecutor() as executor:
+        print("First five instances:", end='\n')
+        goal = [0, 2, [[3, 2, 0], [6, 1, 8], [4, 7, 5]]]
+        instances = [[0, 0, [[0, 7, 1], [4, 3, 2], [8, 6, 5]]],
+                    [0, 2, [[5, 6, 0], [1, 3, 8], [4, 7, 2]]],
+                    [2, 0, [[3, 5, 6], [1, 2, 7], [0, 8, 4]]],
+                    [1, 1, [[7, 3, 5], [4, 0, 2], [8, 1, 6]]],
+                    [2, 0, [[6, 4, 8], [7, 1, 3], [0, 2, 5]]],]
+
+        results = executor.map(run, [(instance, goal) for instance in instances])
+        for depth, number_of_yield, elapsed in results:
+            print(f"Depth = {(depth):3} --- Total_yield: {number_of_yield:6} --- Time = {elapsed:8.2f}")
+
+        print("Next five instances:", end='\n')
+        goal = [2, 2, [[1, 2, 3], [4, 5, 6], [7, 8, 0]]]
+        instances = [[0, 0, [[0, 1, 8], [3, 6, 7], [5, 4, 2]]],
+                     [2, 0, [[6, 4, 1], [7, 3, 2], [0, 5, 8]]],
+                     [0, 0, [[0, 7, 1], [5, 4, 8], [6, 2, 3]]],
+                     [0, 2, [[5, 4, 0], [2, 3, 1], [8, 7, 6]]],
+                     [2, 1, [[8, 6, 7], [2, 5, 4], [3, 0, 1]]],]
+
+        results = executor.map(run, [(instance, goal) for instance in instances])
+        for depth, number_of_yield, elapsed in results:
+            print(f"Depth = {(depth):3} --- Total_yield: {number_of_yield:6} --- Time = {elapsed:8.2f}")
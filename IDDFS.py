@@ -1,100 +1,168 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-In the following program, Iterative Deepening Depth First Search (IDDFS) method 
-will be employed to solve an n-tile puzzle. The code can work with any size of 
+In the following program, Iterative Deepening Depth First Search (IDDFS) method
+will be employed to solve an n-tile puzzle. The code can work with any size of
 the tile puzzle. However, for demonstration, start and goal states of a 8-tile
 puzzle will be used.
 
+Internally, every board is packed into a single integer, with each tile
+occupying 4 bits (one nibble per cell, supporting puzzles up to the
+15-puzzle). A state is then just a pair of small integers, so generating
+a move is a few bit operations instead of deep-copying a nested list.
+
 First five initial instances used for demonstrations are:
     [0, 0, [[0, 7, 1], [4, 3, 2], [8, 6, 5]]],
-    [0, 2, [[5, 6, 0], [1, 3, 8], [4, 7, 2]]], 
-    [2, 0, [[3, 5, 6], [1, 2, 7], [0, 8, 4]]], 
-    [1, 1, [[7, 3, 5], [4, 0, 2], [8, 1, 6]]], 
+    [0, 2, [[5, 6, 0], [1, 3, 8], [4, 7, 2]]],
+    [2, 0, [[3, 5, 6], [1, 2, 7], [0, 8, 4]]],
+    [1, 1, [[7, 3, 5], [4, 0, 2], [8, 1, 6]]],
     [2, 0, [[6, 4, 8], [7, 1, 3], [0, 2, 5]]],
-and the goal state to reach is: 
-    [0, 2, [[3, 2, 0], [6, 1, 8], [4, 7, 5]]]  
+and the goal state to reach is:
+    [0, 2, [[3, 2, 0], [6, 1, 8], [4, 7, 5]]]
 
 Next five initial instances used for demonstrations are:
-    [0, 0, [[0, 1, 8], [3, 6, 7], [5, 4, 2]]], 
-    [2, 0, [[6, 4, 1], [7, 3, 2], [0, 5, 8]]], 
-    [0, 0, [[0, 7, 1], [5, 4, 8], [6, 2, 3]]], 
-    [0, 2, [[5, 4, 0], [2, 3, 1], [8, 7, 6]]], 
+    [0, 0, [[0, 1, 8], [3, 6, 7], [5, 4, 2]]],
+    [2, 0, [[6, 4, 1], [7, 3, 2], [0, 5, 8]]],
+    [0, 0, [[0, 7, 1], [5, 4, 8], [6, 2, 3]]],
+    [0, 2, [[5, 4, 0], [2, 3, 1], [8, 7, 6]]],
     [2, 1, [[8, 6, 7], [2, 5, 4], [3, 0, 1]]],
-with the goal state 
+with the goal state
     [2,2,[[1,2,3],[4,5,6],[7,8,0]]].
 
 As an output, the program will print:
-    1. Depth: the number of moves to reach the goal from each initial state 
-    (i.e. the number of states minus 1 in the shortest path from each instance 
+    1. Depth: the number of moves to reach the goal from each initial state
+    (i.e. the number of states minus 1 in the shortest path from each instance
     to the goal)
-    2. Total_yield: the total number states that the program yield during the 
+    2. Total_yield: the total number states that the program yield during the
     search for a solution for each initial instance
     3. Time: the computing time the search took for each initial instance
 """
 # importing the python libraries
-from copy import deepcopy
-from typing import List, Union
+from concurrent.futures import ProcessPoolExecutor
 from time import process_time
 
-def move_blank(i: int , j: int, n: int) -> tuple:
+def pack(grid: list) -> int:
     """
-    Moving the blank tile function
-   
-    Yielding all the possible movements of the blank tile (down/up/right/left) 
-    from 1 state with 1 move
-    
+    Packing the grid function
+
+    Encoding a nested-list grid into a single integer, with the tile at row r
+    and column c stored in the nibble number n*r+c (4 bits per tile)
+
+    Params:
+    ----
+    - grid (list): the n x n nested list of tiles, with 0 as the blank tile
+
+    Returns:
+    ----
+    - packed (int): the packed integer encoding of the grid
+
+    """
+    n = len(grid)
+    packed = 0
+    for r in range(n):
+        for c in range(n):
+            packed |= grid[r][c] << (4 * (n*r + c))
+    return packed
+
+
+def build_neighbors(n: int) -> list:
+    """
+    Building the neighbor table function
+
+    Precomputing, for every cell of the puzzle, the list of adjacent cells
+    (down/up/right/left) the blank tile can move to, so the bounds checks are
+    done once instead of on every move
+
     Params:
     ----
-    - i (int): the vertical position of the blank tile, i is in range (0,n-1)
-    - j (int): the vertical position of the blank tile, j is in range (0,n-1)
     - n (int): the number of rows/columns in the puzzle
-    
+
     Returns:
     ----
-     - (i1,j1) (tuple): all the possible positions of the blank tile as tuples of (i,j)
-    
+     - neighbors (list): for each flat position 0..n*n-1, the list of the flat
+     positions adjacent to it
+
     """
-    if i+1 < n: 
-        yield (i+1, j)
-    if i-1 >= 0:
-        yield (i-1, j)
-    if j+1 < n:
-        yield (i, j+1) 
-    if j-1 >= 0:
-        yield (i, j-1)
+    neighbors = []
+    for i in range(n):
+        for j in range(n):
+            adjacent = []
+            if i+1 < n:
+                adjacent.append((i+1)*n + j)
+            if i-1 >= 0:
+                adjacent.append((i-1)*n + j)
+            if j+1 < n:
+                adjacent.append(i*n + j+1)
+            if j-1 >= 0:
+                adjacent.append(i*n + j-1)
+            neighbors.append(adjacent)
+    return neighbors
 
 
-def move(state: List) -> List:
+# the neighbor table only depends on the puzzle size, so it is built once
+# and cached at module level instead of being rebuilt for every solved
+# instance
+_NEIGHBORS = {}
+
+def get_neighbors(n: int) -> list:
+    """
+    Getting the cached neighbor table function
+
+    Returning the neighbor table for an n x n puzzle, building it on first
+    use and reusing it afterwards
+
+    Params:
+    ----
+    - n (int): the number of rows/columns in the puzzle
+
+    Returns:
+    ----
+     - neighbors (list): the neighbor table from build_neighbors
+
+    """
+    table = _NEIGHBORS.get(n)
+    if table is None:
+        table = _NEIGHBORS[n] = build_neighbors(n)
+    return table
+
+
+def move(state: tuple, neighbors: list, prev_blank: int=None) -> tuple:
     """
     Changing the state function
-    
-    Yielding all the possible states can be generated from 1 state after 1 move
-    
+
+    Yielding all the possible states can be generated from 1 state after 1 move.
+    The moved tile is swapped with the blank by two shifted XORs on the packed
+    integer (the blank is 0, so only the moved tile's nibbles change), which
+    makes each move allocation-free. The move that would undo the previous one
+    (sliding the blank straight back to where it came from) is skipped, since
+    that state is always a revisit
+
     Params:
     ----
-    - state (list): the state before such move
-    
+    - state (tuple): the state (blank position, packed grid) before such move
+    - neighbors (list): the neighbor table from build_neighbors
+    - prev_blank (int): the blank position before the previous move, or None
+    at the root of the search
+
     Returns:
     ----
-    - next_state (list): all the next possilbe states after such move
-    
+    - next_state (tuple): all the next possilbe states after such move
+
     """
-    global number_of_yield
-    [i, j, grid] = deepcopy(state)
-    n = len(grid)
-    for pos in move_blank(i, j, n):
-        i1, j1 = pos
-        grid[i][j], grid[i1][j1] = grid[i1][j1], grid[i][j]
-        yield [i1, j1, grid]
-        number_of_yield += 1
-        grid[i][j], grid[i1][j1] = grid[i1][j1], grid[i][j]
+    blank, packed = state
+    shift1 = 4 * blank
+    for pos in neighbors[blank]:
+        if pos == prev_blank:
+            continue
+        shift2 = 4 * pos
+        tile = (packed >> shift2) & 0xF
+        yield (pos, packed ^ (tile << shift2) ^ (tile << shift1))
 
 
-def id_dfs(instance: List, goal: List, max_depth: int=100) -> Union[None, List]:
+def id_dfs(instance: list, goal: list, max_depth: int=100) -> tuple:
     """
     IDDFS implementation function
-    
+
     Implementing IDDFS algorithm to find the shortest path to the goal state from
     an instance (initial state)
 
@@ -107,87 +175,118 @@ def id_dfs(instance: List, goal: List, max_depth: int=100) -> Union[None, List]:
     Returns:
     ----
      - None if the solution is not found at the maximum depth
-     - The depth to reach the goal state and the path from the intial state to
-     the goal state
+     - The depth to reach the goal state, the path from the intial state to
+     the goal state as a list of (blank position, packed grid) tuples, and
+     the total number of states generated during the search
     """
-    def dfs_rec(path: List, state: List, max_depth: int) -> List:
+    n = len(goal[-1])
+    neighbors = get_neighbors(n)
+    # the blank position is derivable from the packed grid, so comparing the
+    # packed integers alone is a complete (and single-compare) goal test
+    goal_packed = pack(goal[-1])
+    instance = (instance[0]*n + instance[1], pack(instance[-1]))
+
+    def dfs_rec(path: list, state: tuple, max_depth: int, prev_blank: int=None) -> list:
         """
-        Recusive depth first search 
-        
+        Recusive depth first search
+
         Implementing depth first search algorithm until a maximum depth to check
         if the goal state is reached
-    
+
         Params:
         ----
-         - path (List): the path before the current state
-         - state (List): this state
+         - path (List): the path before the current state, shared across the
+         recursion (appended on the way down, popped on the way back up)
+         - state (Tuple): this state as (blank position, packed grid)
          - max_depth: the maximum depth to explore, taken from the loop below
-    
+         - prev_blank (int): the blank position of this state's parent, used
+         to prune the reverse of the move that produced this state
+
         Returns:
         ----
          - None if the solution is not found at the maximum depth
          - The path from the intial state to the goal state
-        """    
+        """
         path.append(state)
-        if state == goal:
+        if state[1] == goal_packed:
             return path
         else:
             if len(path)>=max_depth:
+                path.pop()
                 return None
             else:
-                for next_state in move(state):
-                    path_copy = path.copy()
-                    if next_state not in path_copy:
-                        solution = dfs_rec(path_copy, next_state, max_depth) 
+                for next_state in move(state, neighbors, prev_blank):
+                    # counting in the expansion loop itself (a closure cell,
+                    # not a module global) also counts every generated child
+                    # exactly once, where the old post-yield global increment
+                    # missed children the caller never resumed past
+                    counter[0] += 1
+                    if next_state[1] not in visited:
+                        visited.add(next_state[1])
+                        solution = dfs_rec(path, next_state, max_depth, state[0])
                         if solution != None:
                             return solution
+                        visited.discard(next_state[1])
+            path.pop()
             return None
 
-    
+
+    visited = {instance[1]}
+    counter = [0]
     for depth in range(max_depth):
         solution = dfs_rec([],instance, depth)
         if solution:
-            return depth, solution
+            return depth, solution, counter[0]
 
 
-def run(instance, goal) -> None:
+def run(args) -> tuple:
     """
-    Run the program
-    
-    Running the program and print the output (Depth, Total_yield, Time):
-    
+    Run one instance
+
+    Solving one instance and measuring the search; the instances are
+    independent, so the main block maps this function over a process pool
+    and prints the collected results in order. The argument is a single
+    (instance, goal) tuple so the function can be passed to executor.map
+
     params:
-    - instance (List): the initial instance/state
-    - goal (List): the goal state
+    - args (tuple): the initial instance/state and the goal state
+
+    Returns:
+    ----
+    - depth (int): the depth at which the solution was found
+    - number_of_yield (int): the total number of states generated
+    - elapsed (float): the CPU time the search took in this process
     """
+    instance, goal = args
     t = process_time()
-    depth,  _ = id_dfs(instance, goal)
+    depth, _, number_of_yield = id_dfs(instance, goal)
     elapsed = process_time() - t
-    print(f"Depth = {(depth-1):3} --- Total_yield: {number_of_yield:10} --- Time = {elapsed:8.2f}")
+    return depth, number_of_yield, elapsed
 
 # Declaring the goal and the initial instances, and running the program:
-    
+
 if __name__ == '__main__':
-    print("First five instances:", end='\n')
-    goal = [0, 2, [[3, 2, 0], [6, 1, 8], [4, 7, 5]]]    
-    instances = [[0, 0, [[0, 7, 1], [4, 3, 2], [8, 6, 5]]],
-                [0, 2, [[5, 6, 0], [1, 3, 8], [4, 7, 2]]],
-                [2, 0, [[3, 5, 6], [1, 2, 7], [0, 8, 4]]],
-                [1, 1, [[7, 3, 5], [4, 0, 2], [8, 1, 6]]],
-                [2, 0, [[6, 4, 8], [7, 1, 3], [0, 2, 5]]]]
-
-    for instance in instances:
-        number_of_yield = 0
-        run(instance, goal)
-
-    print("Second five instances:", end='\n')
-    goal = [2, 2, [[1, 2, 3], [4, 5, 6], [7, 8, 0]]]
-    instances = [[0, 0, [[0, 1, 8], [3, 6, 7], [5, 4, 2]]],
-                  [2, 0, [[6, 4, 1], [7, 3, 2], [0, 5, 8]]],
-                  [0, 0, [[0, 7, 1], [5, 4, 8], [6, 2, 3]]],
-                  [0, 2, [[5, 4, 0], [2, 3, 1], [8, 7, 6]]],
-                  [2, 1, [[8, 6, 7], [2, 5, 4], [3, 0, 1]]]]
-
-    for instance in instances:
-        number_of_yield = 0
-        run(instance, goal)
\ No newline at end of file
+    with ProcessPoolExecutor() as executor:
+        print("First five instances:", end='\n')
+        goal = [0, 2, [[3, 2, 0], [6, 1, 8], [4, 7, 5]]]
+        instances = [[0, 0, [[0, 7, 1], [4, 3, 2], [8, 6, 5]]],
+                    [0, 2, [[5, 6, 0], [1, 3, 8], [4, 7, 2]]],
+                    [2, 0, [[3, 5, 6], [1, 2, 7], [0, 8, 4]]],
+                    [1, 1, [[7, 3, 5], [4, 0, 2], [8, 1, 6]]],
+                    [2, 0, [[6, 4, 8], [7, 1, 3], [0, 2, 5]]]]
+
+        results = executor.map(run, [(instance, goal) for instance in instances])
+        for depth, number_of_yield, elapsed in results:
+            print(f"Depth = {(depth-1):3} --- Total_yield: {number_of_yield:10} --- Time = {elapsed:8.2f}")
+
+        print("Second five instances:", end='\n')
+        goal = [2, 2, [[1, 2, 3], [4, 5, 6], [7, 8, 0]]]
+        instances = [[0, 0, [[0, 1, 8], [3, 6, 7], [5, 4, 2]]],
+                      [2, 0, [[6, 4, 1], [7, 3, 2], [0, 5, 8]]],
+                      [0, 0, [[0, 7, 1], [5, 4, 8], [6, 2, 3]]],
+                      [0, 2, [[5, 4, 0], [2, 3, 1], [8, 7, 6]]],
+                      [2, 1, [[8, 6, 7], [2, 5, 4], [3, 0, 1]]]]
+
+        results = executor.map(run, [(instance, goal) for instance in instances])
+        for depth, number_of_yield, elapsed in results:
+            print(f"Depth = {(depth-1):3} --- Total_yield: {number_of_yield:10} --- Time = {elapsed:8.2f}")